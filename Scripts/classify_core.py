@@ -0,0 +1,148 @@
+"""
+Hot-path core for classify-model-changes.py: snapshot parsing and diffing.
+
+Kept as a standalone, fully type-annotated module so it can be AOT-compiled
+with mypyc for a native-code speedup:
+
+    mypyc Scripts/classify_core.py
+
+When a compiled classify_core extension sits next to this file it is imported
+automatically; otherwise the interpreted module is used, so the compile step
+is strictly optional.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Union
+
+ResultDict = Dict[str, Union[List[str], str]]
+
+@dataclass(slots=True)
+class TypeInfo:
+    """Parsed public type: slotted for compact storage and fast attribute
+    access in the compare hot loop."""
+    kind: str
+    properties: Dict[str, str] = field(default_factory=dict)
+    cases: List[str] = field(default_factory=list)
+
+TYPE_HEADER_PATTERN = re.compile(r'^\s*public\s+(struct|enum)\s+([A-Za-z0-9_]+)[^{\n]*\{', re.MULTILINE)
+PROP_PATTERN        = re.compile(r'^\s*public\s+let\s+([A-Za-z0-9_]+)\s*:\s*([^=]+?)(?:\s*//.*)?$', re.MULTILINE)
+ENUM_CASE_PATTERN   = re.compile(r'^\s*case\s+([A-Za-z0-9_]+)', re.MULTILINE)
+
+def parse_models(text: str) -> Dict[str, TypeInfo]:
+    # One multiline regex pass finds every public type declaration; the brace
+    # walk below uses str.find (memchr under the hood) instead of iterating
+    # lines in Python, and the member patterns run finditer over each body
+    # slice in a single C-level scan.
+    types: Dict[str, TypeInfo] = {}
+    for m in TYPE_HEADER_PATTERN.finditer(text):
+        kind = m.group(1)
+        name = m.group(2)
+        depth = 1
+        pos = m.end()
+        while depth > 0:
+            open_i = text.find('{', pos)
+            close_i = text.find('}', pos)
+            if close_i == -1:
+                pos = len(text)
+                break
+            if open_i != -1 and open_i < close_i:
+                depth += 1
+                pos = open_i + 1
+            else:
+                depth -= 1
+                pos = close_i + 1
+        body = text[m.end():pos]
+        if kind == 'struct':
+            props = {
+                pm.group(1): pm.group(2).strip()
+                for pm in PROP_PATTERN.finditer(body)
+            }
+            types[name] = TypeInfo(kind=kind, properties=props)
+        else:
+            cases = {cm.group(1) for cm in ENUM_CASE_PATTERN.finditer(body)}
+            types[name] = TypeInfo(kind=kind, cases=sorted(cases))
+    return types
+
+def compare(old: Dict[str, TypeInfo], new: Dict[str, TypeInfo]) -> ResultDict:
+    # Identical parses (re-running against the same snapshot, or both sides
+    # hitting the same cache entry) skip the whole per-member diff pass.
+    # Dict equality bails on the first mismatch, so differing inputs pay
+    # almost nothing for this check.
+    if old is new or old == new:
+        return {
+            'added_types': [],
+            'removed_types': [],
+            'changed_type_kind': [],
+            'added_members': [],
+            'removed_members': [],
+            'semver': 'patch'
+        }
+
+    old_names = set(old.keys())
+    new_names = set(new.keys())
+    added_types = sorted(new_names - old_names)
+    removed_types = sorted(old_names - new_names)
+    changed: List[str] = []
+    added_members: List[str] = []
+    removed_members: List[str] = []
+    type_changes: List[str] = []
+
+    for t in sorted(old_names & new_names):
+        o = old[t]; n = new[t]
+        if o.kind != n.kind:
+            type_changes.append(t)
+            continue
+        if o.kind == 'struct':
+            o_props = o.properties; n_props = n.properties
+            # dict.keys() views support set algebra directly; skip the copies
+            o_keys = o_props.keys(); n_keys = n_props.keys()
+            added_p = sorted(n_keys - o_keys)
+            removed_p = sorted(o_keys - n_keys)
+            # changed type
+            type_changed: List[Tuple[str, str, str]] = []
+            for k in (o_keys & n_keys):
+                if o_props[k] != n_props[k]:
+                    type_changed.append((k, o_props[k], n_props[k]))
+            if added_p or removed_p or type_changed:
+                changed.append(t)
+            for p in added_p:
+                added_members.append(f"{t}.{p}")
+            for p in removed_p:
+                removed_members.append(f"{t}.{p}")
+            for (k, ot, nt) in type_changed:
+                removed_members.append(f"{t}.{k}:{ot}")
+                added_members.append(f"{t}.{k}:{nt}")
+        else:  # enum
+            o_cases = set(o.cases); n_cases = set(n.cases)
+            added_c = sorted(n_cases - o_cases)
+            removed_c = sorted(o_cases - n_cases)
+            if added_c or removed_c:
+                changed.append(t)
+            for c in added_c:
+                added_members.append(f"{t}.case.{c}")
+            for c in removed_c:
+                removed_members.append(f"{t}.case.{c}")
+
+    # determine semver
+    major_conditions = any([
+        removed_types,
+        removed_members,
+        type_changes
+    ])
+    # property type changed is encoded as a remove + add pair via removed_members/added_members above
+    if major_conditions:
+        semver = "major"
+    elif added_types or added_members:
+        semver = "minor"
+    else:
+        semver = "patch"
+
+    return {
+        'added_types': added_types,
+        'removed_types': removed_types,
+        'changed_type_kind': type_changes,
+        'added_members': added_members,
+        'removed_members': removed_members,
+        'semver': semver
+    }
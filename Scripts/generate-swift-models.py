@@ -9,17 +9,62 @@ Usage:
     python3 Scripts/generate-swift-models.py
 """
 
+import functools
 import json
 import os
 import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import orjson  # Optional: much faster C parser for the spec load
+except ImportError:
+    orjson = None
+
+# Precompiled patterns for clean_description (compiling per call is wasteful
+# when large specs contain thousands of descriptions)
+MARKDOWN_LINK_PATTERN = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+LEADING_BULLET_PATTERN = re.compile(r'^- `[^`]+`:', re.MULTILINE)
+
+# Fixed substitutions applied by swift_class_name, folded into single-pass
+# regex alternations instead of chained str.replace calls. Kept as two stages
+# because the prefix strips run before PascalCase conversion and the renames
+# run after it.
+NAME_PREFIX_STRIPS = {'OpenAI.': '', 'Azure': ''}
+NAME_PREFIX_PATTERN = re.compile('|'.join(map(re.escape, NAME_PREFIX_STRIPS)))
+NAME_RENAMES = {
+    'CreateEmbeddingRequest': 'EmbeddingRequest',
+    'CreateEmbeddingResponse': 'EmbeddingResponse',
+    'CreateFileRequest': 'FileRequest',
+    'CreateResponse': 'ResponseRequest',
+}
+NAME_RENAME_PATTERN = re.compile('|'.join(map(re.escape, NAME_RENAMES)))
+
+# Translation table mapping every non-identifier character (Latin-1 range) to
+# '_'; lets enum case sanitization run as one C-level str.translate call
+# instead of a per-character Python loop.
+IDENTIFIER_TRANSLATION = str.maketrans(
+    {c: '_' for c in map(chr, range(256)) if not (c.isalnum() or c == '_')}
+)
 
 class SwiftModelGenerator:
     def __init__(self, spec: Dict[str, Any]):
         self.spec = spec
         self.generated_models = []
-        
+        # Memoizes resolved Swift types. Schema dicts aren't hashable, so key
+        # on identity; the spec (and every schema in it) stays alive for the
+        # generator's lifetime, which keeps id() keys stable.
+        self._type_cache: Dict[Tuple[int, Optional[str]], str] = {}
+
     def swift_type_from_schema(self, schema: Dict[str, Any], schema_name: Optional[str] = None) -> str:
+        """Convert OpenAPI schema to Swift type (memoized)."""
+        cache_key = (id(schema), schema_name)
+        cached = self._type_cache.get(cache_key)
+        if cached is None:
+            cached = self._resolve_swift_type(schema, schema_name)
+            self._type_cache[cache_key] = cached
+        return cached
+
+    def _resolve_swift_type(self, schema: Dict[str, Any], schema_name: Optional[str] = None) -> str:
         """Convert OpenAPI schema to Swift type."""
         if '$ref' in schema:
             ref = schema['$ref']
@@ -74,11 +119,12 @@ class SwiftModelGenerator:
         
         return 'Any'  # Fallback
     
-    def swift_class_name(self, name: str) -> str:
-        """Convert OpenAPI schema name to Swift class name."""
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def swift_class_name(name: str) -> str:
+        """Convert OpenAPI schema name to Swift class name (memoized)."""
         # Remove OpenAI. prefix and make Swift-friendly
-        name = name.replace('OpenAI.', '')
-        name = name.replace('Azure', '')
+        name = NAME_PREFIX_PATTERN.sub('', name)
         
         # Handle special problematic names first
         if name == 'expires_after':
@@ -101,10 +147,7 @@ class SwiftModelGenerator:
             name = name[0].upper() + name[1:]
         
         # Handle special cases
-        name = name.replace('CreateEmbeddingRequest', 'EmbeddingRequest')
-        name = name.replace('CreateEmbeddingResponse', 'EmbeddingResponse')
-        name = name.replace('CreateFileRequest', 'FileRequest')
-        name = name.replace('CreateResponse', 'ResponseRequest') 
+        name = NAME_RENAME_PATTERN.sub(lambda m: NAME_RENAMES[m.group(0)], name)
         
         # Ensure it starts with 'Generated'
         if not name.startswith('Generated'):
@@ -112,8 +155,10 @@ class SwiftModelGenerator:
             
         return name
     
-    def swift_property_name(self, name: str) -> str:
-        """Convert property name to Swift camelCase."""
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def swift_property_name(name: str) -> str:
+        """Convert property name to Swift camelCase (memoized)."""
         # Convert snake_case to camelCase
         components = name.split('_')
         if len(components) > 1:
@@ -121,49 +166,51 @@ class SwiftModelGenerator:
         return name
     
     def generate_enum(self, name: str, schema: Dict[str, Any]) -> str:
-        """Generate Swift enum from OpenAPI enum schema."""
+        """Generate a Swift enum from an OpenAPI enum schema."""
         swift_name = self.swift_class_name(name)
         enum_values = schema.get('enum', [])
-        
-        lines = [
-            f'/// Generated enum for {name}',
-            f'public enum {swift_name}: String, Codable, CaseIterable {{',
-        ]
-        
-        for value in enum_values:
-            # Create a valid Swift identifier from the enum value
-            case_name = value.lower()
-            # Replace dots, dashes, and other special characters
-            case_name = case_name.replace('.', '_').replace('-', '_').replace(' ', '_')
-            # Remove any other non-alphanumeric characters except underscores
-            case_name = ''.join(c if c.isalnum() or c == '_' else '_' for c in case_name)
-            # Ensure it doesn't start with a number
-            if case_name and case_name[0].isdigit():
-                case_name = f'case_{case_name}'
-            # Handle empty case names
-            if not case_name:
-                case_name = 'unknown'
-            
-            lines.append(f'    case {case_name} = "{value}"')
-        
-        lines.extend([
-            '}',
-            ''
-        ])
-        
-        return '\n'.join(lines)
+
+        cases_block = ''.join(
+            f'    case {self.swift_enum_case_name(value)} = "{value}"\n'
+            for value in enum_values
+        )
+        return (
+            f'/// Generated enum for {name}\n'
+            f'public enum {swift_name}: String, Codable, CaseIterable {{\n'
+            f'{cases_block}'
+            '}\n'
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def swift_enum_case_name(value: str) -> str:
+        """Create a valid Swift identifier from an enum value (memoized)."""
+        case_name = value.lower()
+        # Replace dots, dashes, and other special characters
+        case_name = case_name.replace('.', '_').replace('-', '_').replace(' ', '_')
+        # Remove any other non-alphanumeric characters except underscores
+        case_name = case_name.translate(IDENTIFIER_TRANSLATION)
+        # Ensure it doesn't start with a number
+        if case_name and case_name[0].isdigit():
+            case_name = f'case_{case_name}'
+        # Handle empty case names
+        if not case_name:
+            case_name = 'unknown'
+        return case_name
     
-    def clean_description(self, description: str) -> str:
-        """Clean up description text for Swift comments."""
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def clean_description(description: str) -> str:
+        """Clean up description text for Swift comments (memoized; many
+        OpenAPI descriptions repeat verbatim across schemas)."""
         if not description:
             return ""
         
         # Remove markdown links [text](url) -> text
-        import re
-        description = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', description)
-        
+        description = MARKDOWN_LINK_PATTERN.sub(r'\1', description)
+
         # Remove standalone markdown links that start lines
-        description = re.sub(r'^- `[^`]+`:', '', description, flags=re.MULTILINE)
+        description = LEADING_BULLET_PATTERN.sub('', description)
         
         # Clean up extra whitespace and newlines
         description = ' '.join(description.split())
@@ -175,135 +222,118 @@ class SwiftModelGenerator:
         return description
     
     def generate_struct(self, name: str, schema: Dict[str, Any]) -> str:
-        """Generate Swift struct from OpenAPI object schema."""
+        """Generate a Swift struct from an OpenAPI object schema."""
         swift_name = self.swift_class_name(name)
         properties = schema.get('properties', {})
         required = set(schema.get('required', []))
-        
-        lines = [
-            f'/// Generated model for {name}',
-            f'public struct {swift_name}: Codable, Equatable {{',
+
+        # Resolve each property's Swift name and type exactly once; the
+        # Equatable check and the emission loop below share this list.
+        resolved = [
+            (prop_name, self.swift_property_name(prop_name),
+             self.swift_type_from_schema(prop_schema, prop_name), prop_schema)
+            for prop_name, prop_schema in properties.items()
         ]
-        
-        # Generate properties
-        for prop_name, prop_schema in properties.items():
-            swift_prop_name = self.swift_property_name(prop_name)
-            swift_type = self.swift_type_from_schema(prop_schema, prop_name)
-            
-            # Make optional if not required
-            if prop_name not in required:
-                swift_type = f'{swift_type}?'
-            
-            description = self.clean_description(prop_schema.get('description', ''))
-            if description:
-                lines.append(f'    /// {description}')
-            lines.append(f'    public let {swift_prop_name}: {swift_type}')
-            lines.append('')
-        
-    def generate_struct(self, name: str, schema: Dict[str, Any]) -> str:
-        """Generate Swift struct from OpenAPI object schema."""
-        swift_name = self.swift_class_name(name)
-        properties = schema.get('properties', {})
-        required = set(schema.get('required', []))
-        
+
         # Check if any properties use non-Equatable types (SAOAIJSONValue is Equatable)
         has_non_equatable = any(
-            '[String: Any]' in self.swift_type_from_schema(prop_schema, prop_name)
-            for prop_name, prop_schema in properties.items()
+            '[String: Any]' in swift_type for _, _, swift_type, _ in resolved
         )
-        
+
         # Use Codable only if we have non-Equatable types
         conformance = 'Codable' if has_non_equatable else 'Codable, Equatable'
-        
-        lines = [
-            f'/// Generated model for {name}',
-            f'public struct {swift_name}: {conformance} {{',
-        ]
-        
-        # Generate properties
-        for prop_name, prop_schema in properties.items():
-            swift_prop_name = self.swift_property_name(prop_name)
-            swift_type = self.swift_type_from_schema(prop_schema, prop_name)
-            
-            # Make optional if not required
-            if prop_name not in required:
-                swift_type = f'{swift_type}?'
-            
-            description = self.clean_description(prop_schema.get('description', ''))
-            if description:
-                lines.append(f'    /// {description}')
-            lines.append(f'    public let {swift_prop_name}: {swift_type}')
-            lines.append('')
-        
-        # Generate CodingKeys if needed
+
+        # Generate properties as one joined block (optional when not required)
+        props_block = ''.join(
+            (f'    /// {description}\n' if description else '')
+            + f'    public let {swift_prop_name}: '
+            + (f'{swift_type}\n\n' if prop_name in required else f'{swift_type}?\n\n')
+            for prop_name, swift_prop_name, swift_type, description in (
+                (p, s, t, self.clean_description(schema_.get('description', '')))
+                for p, s, t, schema_ in resolved
+            )
+        )
+
+        # Generate CodingKeys if needed; reuse the resolved names from above
+        # instead of re-deriving each property name twice more.
         coding_keys_needed = any(
-            self.swift_property_name(prop_name) != prop_name 
-            for prop_name in properties.keys()
+            swift_prop_name != prop_name
+            for prop_name, swift_prop_name, _, _ in resolved
         )
-        
+
+        keys_block = ''
         if coding_keys_needed:
-            lines.append('    private enum CodingKeys: String, CodingKey {')
-            for prop_name in properties.keys():
-                swift_prop_name = self.swift_property_name(prop_name)
-                if swift_prop_name != prop_name:
-                    lines.append(f'        case {swift_prop_name} = "{prop_name}"')
-                else:
-                    lines.append(f'        case {swift_prop_name}')
-            lines.append('    }')
-            lines.append('')
-        
-        lines.extend([
-            '}',
-            ''
-        ])
-        
-        return '\n'.join(lines)
+            keys_block = (
+                '    private enum CodingKeys: String, CodingKey {\n'
+                + ''.join(
+                    f'        case {swift_prop_name} = "{prop_name}"\n'
+                    if swift_prop_name != prop_name
+                    else f'        case {swift_prop_name}\n'
+                    for prop_name, swift_prop_name, _, _ in resolved
+                )
+                + '    }\n\n'
+            )
+
+        return (
+            f'/// Generated model for {name}\n'
+            f'public struct {swift_name}: {conformance} {{\n'
+            f'{props_block}'
+            f'{keys_block}'
+            '}\n'
+        )
     
-    def generate_models(self) -> str:
-        """Generate all Swift models from the OpenAPI spec."""
+    def generate_model_chunks(self):
+        """Yield (kind, text) chunks for all Swift models from the OpenAPI spec.
+
+        Streaming per-type chunks keeps the writer from double-buffering the
+        whole generated file in memory and lets it count types as it goes.
+        """
         schemas = self.spec.get('components', {}).get('schemas', {})
-        
-        lines = [
+
+        header = [
             '// Generated Swift Models from OpenAPI Specification',
             '// DO NOT EDIT: This file is automatically generated',
             '',
             'import Foundation',
             '',
         ]
-        
+        yield 'header', '\n'.join(header)
+
         # Generate enums first
         for name, schema in schemas.items():
             if schema.get('type') == 'string' and 'enum' in schema:
-                lines.append(self.generate_enum(name, schema))
+                yield 'enum', self.generate_enum(name, schema)
             elif 'anyOf' in schema:
                 # For anyOf schemas that mix string and enum, just treat as String for simplicity
                 # In a more complete implementation, we might generate a proper enum
                 continue
-        
+
         # Generate structs
         for name, schema in schemas.items():
             if schema.get('type') == 'object' or 'properties' in schema:
-                lines.append(self.generate_struct(name, schema))
-        
-        return '\n'.join(lines)
-    
+                yield 'struct', self.generate_struct(name, schema)
+
     def write_generated_models(self):
         """Write generated models to the Generated directory."""
         output_dir = 'Sources/SwiftAzureOpenAI/Generated'
         os.makedirs(output_dir, exist_ok=True)
-        
-        models_content = self.generate_models()
-        
+
         output_file = os.path.join(output_dir, 'GeneratedModels.swift')
+        enum_count = 0
+        struct_count = 0
         with open(output_file, 'w') as f:
-            f.write(models_content)
-        
+            first = True
+            for kind, chunk in self.generate_model_chunks():
+                if not first:
+                    f.write('\n')
+                f.write(chunk)
+                first = False
+                if kind == 'enum':
+                    enum_count += 1
+                elif kind == 'struct':
+                    struct_count += 1
+
         print(f"Generated models written to: {output_file}")
-        
-        # Count generated items
-        enum_count = models_content.count('public enum ')
-        struct_count = models_content.count('public struct ')
-        
         print(f"Generated {enum_count} enums and {struct_count} structs")
 
 def main():
@@ -311,9 +341,13 @@ def main():
     spec_file = 'Specs/pruned-openapi.json'
     
     try:
-        with open(spec_file, 'r') as f:
-            spec = json.load(f)
-        
+        if orjson is not None:
+            with open(spec_file, 'rb') as f:
+                spec = orjson.loads(f.read())
+        else:
+            with open(spec_file, 'r') as f:
+                spec = json.load(f)
+
         print(f"Loaded pruned OpenAPI spec from {spec_file}")
         
         generator = SwiftModelGenerator(spec)
@@ -12,138 +12,410 @@ Usage:
     python3 Scripts/prune-openapi-spec.py
 """
 
+import argparse
+import hashlib
 import json
+import mmap
+import os
+import re
+import shutil
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Mapping
 from typing import Dict, Set, Any
 
-def collect_referenced_schemas(spec: Dict[str, Any], paths_to_keep: Set[str]) -> Set[str]:
+try:
+    import orjson  # Optional: SIMD-accelerated JSON parse/serialize
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson  # Optional: lazy element API avoids materializing unused subtrees
+except ImportError:
+    simdjson = None
+
+try:
+    import ijson  # Optional: streaming parser, keeps peak memory low
+except ImportError:
+    ijson = None
+
+# Top-level spec sections the pruner actually consumes; everything else
+# (tags, webhooks, extensions, ...) can be dropped at parse time.
+SPEC_SECTIONS = ('openapi', 'info', 'servers', 'security', 'paths', 'components')
+
+# Endpoint prefixes kept in the pruned spec (as per roadmap requirements).
+# str.startswith accepts a tuple, so membership is one C call per path
+# instead of a chain of short-circuited Python comparisons.
+KEEP_PATH_PREFIXES = ('/responses', '/files', '/embeddings')
+
+# Files above this size are parsed through mmap (zero-copy page-cache
+# access); below it, mmap setup costs more than the read it saves.
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'saoai-prune')
+
+def _cache_path(input_bytes: bytes, compact: bool, cache_dir: str) -> str:
+    """Cache entry for a pruned spec, keyed by input content and settings.
+
+    The key hashes the raw input bytes plus the kept-path prefixes and the
+    output format, so editing the spec, the prefix list, or switching
+    --compact each produce a distinct entry.
+    """
+    h = hashlib.blake2b(input_bytes, digest_size=16)
+    h.update(repr((KEEP_PATH_PREFIXES, compact)).encode('utf-8'))
+    return os.path.join(cache_dir, f"{h.hexdigest()}.json")
+
+class LazyJSONMap(Mapping):
+    """Dict-like view over a simdjson object that materializes values on
+    first access.
+
+    The pruner touches only a handful of paths and the reachable slice of
+    components.schemas, so >90% of a large spec never needs to become Python
+    dicts at all.
+    """
+
+    def __init__(self, element):
+        self._element = element
+        self._keys = list(element.keys())
+        self._key_set = set(self._keys)
+        self._cache: Dict[str, Any] = {}
+
+    def __getitem__(self, key):
+        if key not in self._cache:
+            value = self._element[key]
+            if hasattr(value, 'as_dict'):
+                value = value.as_dict()
+            elif hasattr(value, 'as_list'):
+                value = value.as_list()
+            self._cache[key] = value
+        return self._cache[key]
+
+    def __contains__(self, key):
+        return key in self._key_set
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+def load_spec(path: str) -> Dict[str, Any]:
+    """Load an OpenAPI spec, preferring lazy/fast parsers when available."""
+    if simdjson is not None:
+        try:
+            parser = simdjson.Parser()
+            doc = parser.load(path)
+            # Materialize the small top-level sections eagerly; keep the two
+            # big maps (paths, schemas) as lazy views. The parser must stay
+            # alive as long as the views do, so stash it on the spec dict.
+            components = doc['components'] if 'components' in doc else None
+            spec: Dict[str, Any] = {
+                '_simdjson_parser': parser,
+                'openapi': doc['openapi'],
+                'info': doc['info'].as_dict(),
+                'servers': doc['servers'].as_list() if 'servers' in doc else [],
+                'security': doc['security'].as_list() if 'security' in doc else [],
+                'paths': LazyJSONMap(doc['paths']) if 'paths' in doc else {},
+                'components': {
+                    'schemas': (LazyJSONMap(components['schemas'])
+                                if components is not None and 'schemas' in components else {}),
+                    'securitySchemes': (components['securitySchemes'].as_dict()
+                                        if components is not None and 'securitySchemes' in components else {}),
+                },
+            }
+            return spec
+        except Exception:
+            # Any surprise in the lazy path falls back to a full parse.
+            pass
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                # Mapping the file hands the parser the page cache directly
+                # instead of copying the whole file into an intermediate
+                # bytes object first; the memoryview wrapper is zero-copy
+                # (orjson does not take mmap objects as-is).
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return orjson.loads(memoryview(mm))
+            return orjson.loads(f.read())
+    if ijson is not None:
+        # Stream top-level (key, value) pairs and keep only the sections the
+        # pruner reads; other top-level subtrees are discarded as parsed
+        # instead of being held in the final dict.
+        spec = {}
+        with open(path, 'rb') as f:
+            for key, value in ijson.kvitems(f, ''):
+                if key in SPEC_SECTIONS:
+                    spec[key] = value
+        return spec
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_spec(spec: Dict[str, Any], path: str, compact: bool = False) -> None:
+    """Write a spec as JSON.
+
+    Default output is sorted and indented: the pruned spec is a committed
+    artifact and nightly CI diffs it, so byte-stable pretty output matters.
+    Compact mode skips the recursive key sort and indentation (roughly half
+    the bytes written) for callers that only feed the file to the generator.
+    """
+    if orjson is not None:
+        option = 0 if compact else orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(spec, option=option))
+        return
+    with open(path, 'w') as f:
+        if compact:
+            json.dump(spec, f, separators=(',', ':'))
+        else:
+            json.dump(spec, f, indent=2, sort_keys=True)
+
+_REF_PREFIX = sys.intern('#/components/schemas/')
+_REF_PREFIX_LEN = len(_REF_PREFIX)
+
+# Matches serialized $ref entries pointing into components.schemas. Operating
+# on raw JSON bytes lets the regex engine scan a whole subtree in one C-level
+# pass instead of visiting every dict/list node in Python.
+_REF_RE = re.compile(rb'"\$ref"\s*:\s*"#/components/schemas/([^"]+)"')
+
+def extract_refs_serialized(obj: Any) -> Set[str]:
+    """Collect schema names from $ref values by regex-scanning serialized JSON.
+
+    Only used when orjson is available: serialization there is cheap enough
+    that dumps + one findall beats the Python-level tree walk on big subtrees.
+    """
+    return {sys.intern(m.decode('utf-8')) for m in _REF_RE.findall(orjson.dumps(obj))}
+
+def extract_refs(obj: Any) -> Set[str]:
+    """Collect schema names from all $ref values in a JSON subtree.
+
+    Iterative with an explicit work stack: avoids CPython frame setup per
+    node and cannot hit the recursion limit on deeply nested schemas.
+    """
+    refs = set()
+    stack = deque([obj])
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get('$ref')
+            # Slice-compare against the interned prefix constant: one
+            # C-level string compare per $ref instead of a startswith
+            # method call. The tail slice (not replace(), which rescans
+            # the whole string) is interned so the N duplicate slices for
+            # a popular schema collapse to one allocation and later set
+            # probes can short-circuit on pointer identity.
+            if isinstance(ref, str) and ref[:_REF_PREFIX_LEN] == _REF_PREFIX:
+                refs.add(sys.intern(ref[_REF_PREFIX_LEN:]))
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return refs
+
+# Single dispatch point so callers do not re-check orjson availability.
+refs_in_subtree = extract_refs_serialized if orjson is not None else extract_refs
+
+def collect_referenced_schemas(paths_obj: Mapping, paths_to_keep: Set[str]) -> Set[str]:
     """Collect all schema references used by the endpoints we want to keep."""
     referenced_schemas = set()
-    
-    def extract_refs_from_object(obj):
-        """Recursively extract $ref values from an object."""
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                if key == '$ref' and isinstance(value, str):
-                    # Extract schema name from reference like "#/components/schemas/ResponseObject"
-                    if value.startswith('#/components/schemas/'):
-                        schema_name = value.replace('#/components/schemas/', '')
-                        referenced_schemas.add(schema_name)
-                else:
-                    extract_refs_from_object(value)
-        elif isinstance(obj, list):
-            for item in obj:
-                extract_refs_from_object(item)
-    
+
     # Extract references from all paths we want to keep
     for path in paths_to_keep:
-        if path in spec.get('paths', {}):
-            extract_refs_from_object(spec['paths'][path])
-    
+        if path in paths_obj:
+            referenced_schemas |= refs_in_subtree(paths_obj[path])
+
     return referenced_schemas
 
-def expand_schema_dependencies(spec: Dict[str, Any], initial_schemas: Set[str]) -> Set[str]:
+# Memoized direct-refs per schema, keyed by (schemas map identity, name) so
+# two specs loaded in one process cannot cross-contaminate. frozenset values
+# are shared, never mutated by callers.
+_SCHEMA_REFS_CACHE: Dict[tuple, frozenset] = {}
+
+def refs_of_schema(schemas_component: Mapping, name: str) -> frozenset:
+    """Direct schema refs of a named schema, walking its body at most once."""
+    key = (id(schemas_component), name)
+    cached = _SCHEMA_REFS_CACHE.get(key)
+    if cached is None:
+        cached = _SCHEMA_REFS_CACHE[key] = frozenset(refs_in_subtree(schemas_component[name]))
+    return cached
+
+# Below this many uncached schemas a process pool costs more in worker
+# startup and IPC than the serial scan.
+_PARALLEL_SCAN_THRESHOLD = 64
+
+def _scan_refs_payload(payload: bytes) -> frozenset:
+    """Worker-side extractor: one bytes-regex pass over a serialized schema."""
+    return frozenset(sys.intern(m.decode('utf-8')) for m in _REF_RE.findall(payload))
+
+def build_schema_dependency_graph(schemas_component: Mapping, names) -> Dict[str, frozenset]:
+    """Direct schema-to-schema dependency edges for the given names.
+
+    Each schema body is walked exactly once; the result maps schema name to
+    the frozenset of schema names it references directly. Scanning is
+    independent per schema, so large batches of uncached names fan out to a
+    process pool: bodies are serialized once in the parent and the workers
+    run only the bytes regex, keeping IPC payloads flat.
+    """
+    present = [name for name in names if name in schemas_component]
+    if orjson is not None:
+        misses = [name for name in present
+                  if (id(schemas_component), name) not in _SCHEMA_REFS_CACHE]
+        if len(misses) >= _PARALLEL_SCAN_THRESHOLD:
+            payloads = [orjson.dumps(schemas_component[name]) for name in misses]
+            with ProcessPoolExecutor() as ex:
+                for name, refs in zip(misses, ex.map(_scan_refs_payload, payloads, chunksize=16)):
+                    _SCHEMA_REFS_CACHE[(id(schemas_component), name)] = refs
+    return {name: refs_of_schema(schemas_component, name) for name in present}
+
+def expand_schema_dependencies(schemas_component: Mapping, initial_schemas: Set[str]) -> Set[str]:
     """Expand schema set to include all dependencies (schemas referenced by other schemas)."""
-    all_schemas = initial_schemas.copy()
-    schemas_component = spec.get('components', {}).get('schemas', {})
-    
-    # Keep expanding until no new schemas are found
-    changed = True
-    while changed:
-        changed = False
-        current_size = len(all_schemas)
-        
-        # Check each schema we already have for additional references
-        for schema_name in list(all_schemas):
-            if schema_name in schemas_component:
-                schema_def = schemas_component[schema_name]
-                # Extract refs from this schema definition
-                refs = set()
-                
-                def extract_refs(obj):
-                    if isinstance(obj, dict):
-                        for key, value in obj.items():
-                            if key == '$ref' and isinstance(value, str):
-                                if value.startswith('#/components/schemas/'):
-                                    ref_name = value.replace('#/components/schemas/', '')
-                                    refs.add(ref_name)
-                            else:
-                                extract_refs(value)
-                    elif isinstance(obj, list):
-                        for item in obj:
-                            extract_refs(item)
-                
-                extract_refs(schema_def)
-                all_schemas.update(refs)
-        
-        if len(all_schemas) > current_size:
-            changed = True
-    
+    # Build the dependency graph layer by layer and compute reachability via
+    # set unions. Edges are only materialized for the reachable slice: the
+    # pruner asks a single reachability question, so precomputing edges for
+    # all N schemas would walk (and materialize) bodies the lazy loader
+    # deliberately never touches.
+    deps: Dict[str, frozenset] = {}
+    all_schemas = set(initial_schemas)
+    frontier = set(initial_schemas)
+    while frontier:
+        layer = build_schema_dependency_graph(schemas_component, frontier)
+        deps.update(layer)
+        discovered = set().union(*layer.values()) if layer else set()
+        frontier = discovered - all_schemas
+        all_schemas |= frontier
+
     return all_schemas
 
-def prune_openapi_spec():
+def prune(spec: Dict[str, Any], paths_to_keep: Set[str]) -> Dict[str, Any]:
+    """Build the pruned spec for the given kept paths.
+
+    Pure function over the loaded spec: CI or other scripts can import and
+    call this directly instead of shelling out and re-parsing the output.
+    """
+    # Hoist the nested component lookups once; every spec.get(...).get(...)
+    # chain below would otherwise rebuild throwaway default dicts per call.
+    paths_obj = spec.get('paths') or {}
+    components = spec.get('components') or {}
+    original_schemas = components.get('schemas') or {}
+
+    # Collect referenced schemas
+    referenced_schemas = collect_referenced_schemas(paths_obj, paths_to_keep)
+    print(f"Found {len(referenced_schemas)} directly referenced schemas")
+
+    # Expand to include all schema dependencies
+    all_schemas = expand_schema_dependencies(original_schemas, referenced_schemas)
+    print(f"Expanded to {len(all_schemas)} total schemas (including dependencies)")
+
+    pruned_spec = {
+        'openapi': spec['openapi'],
+        'info': {
+            **spec['info'],
+            'title': 'Azure OpenAI API (Pruned for SwiftAzureOpenAI)',
+            'description': 'Pruned version containing only responses, files, and embeddings endpoints'
+        },
+        'servers': spec.get('servers', []),
+        'security': spec.get('security', []),
+        'paths': {},
+        'components': {
+            'schemas': {},
+            'securitySchemes': components.get('securitySchemes') or {}
+        }
+    }
+
+    # Add kept paths
+    for path in paths_to_keep:
+        if path in paths_obj:
+            pruned_spec['paths'][path] = paths_obj[path]
+
+    # Add kept schemas
+    for schema_name in all_schemas:
+        if schema_name in original_schemas:
+            pruned_spec['components']['schemas'][schema_name] = original_schemas[schema_name]
+
+    return pruned_spec
+
+def generate_swift_models(pruned_spec: Dict[str, Any]) -> None:
+    """Run the Swift model generator in-process against the pruned dict.
+
+    Skips the serialize/reparse round-trip through pruned-openapi.json that
+    the two-step CLI flow pays. The generator module has a dash in its file
+    name, so it is loaded via importlib rather than a plain import. The
+    schemas subtree is deep key-sorted first: emitted member order follows
+    dict order, and the JSON artifact the generator normally reads is
+    recursively key-sorted, so this keeps the Swift output byte-identical
+    between the in-process and two-step flows.
+    """
+    import importlib.util
+    module_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generate-swift-models.py')
+    module_spec = importlib.util.spec_from_file_location('generate_swift_models', module_path)
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+
+    def deep_sorted(value):
+        if isinstance(value, dict):
+            return {k: deep_sorted(value[k]) for k in sorted(value)}
+        if isinstance(value, list):
+            return [deep_sorted(v) for v in value]
+        return value
+
+    spec_for_generator = dict(pruned_spec)
+    spec_for_generator['components'] = dict(pruned_spec['components'])
+    spec_for_generator['components']['schemas'] = deep_sorted(pruned_spec['components']['schemas'])
+    module.SwiftModelGenerator(spec_for_generator).write_generated_models()
+
+def prune_openapi_spec(compact: bool = False, verbose: bool = False, generate: bool = False,
+                       cache_dir: str = DEFAULT_CACHE_DIR):
     """Main function to prune the OpenAPI specification."""
     input_file = 'Specs/full-openapi.json'
     output_file = 'Specs/pruned-openapi.json'
-    
+
     try:
+        # Most runs see an unchanged input spec; a content-hash hit turns
+        # the whole pipeline into a hash plus one file copy.
+        with open(input_file, 'rb') as f:
+            input_bytes = f.read()
+        cache_file = _cache_path(input_bytes, compact, cache_dir)
+        if os.path.isfile(cache_file):
+            shutil.copyfile(cache_file, output_file)
+            print(f"Input spec unchanged; reused cached pruned spec")
+            print(f"Output written to: {output_file}")
+            if generate:
+                if orjson is not None:
+                    pruned_spec = orjson.loads(open(output_file, 'rb').read())
+                else:
+                    pruned_spec = json.load(open(output_file, 'r'))
+                generate_swift_models(pruned_spec)
+            return
+
         # Load the full specification
-        with open(input_file, 'r') as f:
-            spec = json.load(f)
-            
+        spec = load_spec(input_file)
+
         print(f"Loaded OpenAPI spec with {len(spec.get('paths', {}))} paths")
-        
-        # Define the paths we want to keep (as per roadmap requirements)
-        paths_to_keep = set()
-        for path in spec.get('paths', {}):
-            if (path.startswith('/responses') or 
-                path.startswith('/files') or 
-                path.startswith('/embeddings')):
-                paths_to_keep.add(path)
-        
-        print(f"Identified {len(paths_to_keep)} paths to keep:")
-        for path in sorted(paths_to_keep):
-            print(f"  {path}")
-        
-        # Collect referenced schemas
-        referenced_schemas = collect_referenced_schemas(spec, paths_to_keep)
-        print(f"Found {len(referenced_schemas)} directly referenced schemas")
-        
-        # Expand to include all schema dependencies
-        all_schemas = expand_schema_dependencies(spec, referenced_schemas)
-        print(f"Expanded to {len(all_schemas)} total schemas (including dependencies)")
-        
-        # Create pruned specification
-        pruned_spec = {
-            'openapi': spec['openapi'],
-            'info': {
-                **spec['info'],
-                'title': 'Azure OpenAI API (Pruned for SwiftAzureOpenAI)',
-                'description': 'Pruned version containing only responses, files, and embeddings endpoints'
-            },
-            'servers': spec.get('servers', []),
-            'security': spec.get('security', []),
-            'paths': {},
-            'components': {
-                'schemas': {},
-                'securitySchemes': spec.get('components', {}).get('securitySchemes', {})
-            }
-        }
-        
-        # Add kept paths
-        for path in paths_to_keep:
-            if path in spec['paths']:
-                pruned_spec['paths'][path] = spec['paths'][path]
-        
-        # Add kept schemas
-        original_schemas = spec.get('components', {}).get('schemas', {})
-        for schema_name in all_schemas:
-            if schema_name in original_schemas:
-                pruned_spec['components']['schemas'][schema_name] = original_schemas[schema_name]
-        
-        # Write pruned specification
-        with open(output_file, 'w') as f:
-            json.dump(pruned_spec, f, indent=2, sort_keys=True)
+
+        # Define the paths we want to keep
+        paths_to_keep = {path for path in spec.get('paths', {})
+                         if path.startswith(KEEP_PATH_PREFIXES)}
+
+        print(f"Identified {len(paths_to_keep)} paths to keep")
+        if verbose:
+            # One buffered write for the whole listing instead of a print
+            # (stdout lock + flush) per path.
+            sys.stdout.write(''.join(f"  {path}\n" for path in sorted(paths_to_keep)))
+
+        pruned_spec = prune(spec, paths_to_keep)
+
+        # Write pruned specification. The JSON artifact is still emitted even
+        # when generating in-process: it is committed and diffed by CI.
+        save_spec(pruned_spec, output_file, compact=compact)
+
+        # Populate the cache for the next run; failure to cache is harmless.
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            shutil.copyfile(output_file, cache_file)
+        except OSError:
+            pass
+
+        if generate:
+            generate_swift_models(pruned_spec)
         
         print(f"\nPruning complete!")
         print(f"Original: {len(spec.get('paths', {}))} paths, {len(spec.get('components', {}).get('schemas', {}))} schemas")
@@ -169,4 +441,15 @@ def prune_openapi_spec():
         sys.exit(1)
 
 if __name__ == '__main__':
-    prune_openapi_spec()
\ No newline at end of file
+    ap = argparse.ArgumentParser(description='Prune the full OpenAPI spec for SwiftAzureOpenAI')
+    ap.add_argument('--compact', action='store_true',
+                    help='Write unsorted, unindented JSON (for generator-only consumption)')
+    ap.add_argument('--verbose', action='store_true',
+                    help='List every kept path in addition to the summary counts')
+    ap.add_argument('--generate', action='store_true',
+                    help='Also run the Swift model generator in-process on the pruned spec')
+    ap.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                    help='Directory for cached pruned specs keyed by input content hash')
+    args = ap.parse_args()
+    prune_openapi_spec(compact=args.compact, verbose=args.verbose, generate=args.generate,
+                       cache_dir=args.cache_dir)
\ No newline at end of file